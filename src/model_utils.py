@@ -2,29 +2,109 @@ import pandas as pd
 import numpy as np
 import joblib
 from sklearn.pipeline import Pipeline
-from typing import Dict, Tuple, Union, List
+from typing import Dict, FrozenSet, Tuple, List
 import streamlit as st
+from streamlit.file_util import get_streamlit_file_path
 from pathlib import Path
+import hashlib
+
+# Static feature metadata, built once at import time
+# Column order the pipeline was fitted with (training CSV minus 'Stage')
+_FEATURE_ORDER: Tuple[str, ...] = (
+    'Age', 'Sex', 'Albumin', 'Bilirubin', 'ALT', 'AST', 'ALP', 'INR',
+    'Platelets', 'Sodium', 'Creatinine', 'Ascites', 'Hepatomegaly',
+    'Spiders', 'Edema'
+)
+_REQUIRED_FIELDS: FrozenSet[str] = frozenset(_FEATURE_ORDER)
+
+_FEATURE_RANGES: Dict[str, Tuple[float, float]] = {
+    'Age': (18, 90),
+    'Albumin': (2.0, 6.0),
+    'Bilirubin': (0.3, 10.0),
+    'ALT': (7, 2000),
+    'AST': (10, 2000),
+    'ALP': (44, 500),
+    'INR': (0.5, 5.0),
+    'Platelets': (20, 500),
+    'Sodium': (125, 145),
+    'Creatinine': (0.5, 4.0)
+}
+
+_FEATURE_DESCRIPTIONS: Dict[str, str] = {
+    'Age': "Patient's age in years",
+    'Sex': "Patient's biological sex (M/F)",
+    'Albumin': "Serum albumin level (Normal: 3.5-5.5 g/dL)",
+    'Bilirubin': "Total bilirubin level (Normal: 0.3-1.2 mg/dL)",
+    'ALT': "Alanine aminotransferase (Normal: 7-56 U/L)",
+    'AST': "Aspartate aminotransferase (Normal: 10-40 U/L)",
+    'ALP': "Alkaline phosphatase (Normal: 44-147 U/L)",
+    'INR': "International normalized ratio (Normal: 0.8-1.1)",
+    'Platelets': "Platelet count (Normal: 150-450 ×10⁹/L)",
+    'Sodium': "Serum sodium level (Normal: 135-145 mEq/L)",
+    'Creatinine': "Serum creatinine (Normal: 0.7-1.3 mg/dL)",
+    'Ascites': "Accumulation of fluid in the peritoneal cavity",
+    'Hepatomegaly': "Enlarged liver",
+    'Spiders': "Spider angiomas (spider-like blood vessels)",
+    'Edema': "Swelling caused by fluid retention"
+}
+
+# Use the absolute path relative to this script’s location
+_MODEL_PATH = Path(__file__).resolve().parent / 'liver_disease_staging_model.pkl'
+
+# Model version the on-disk prediction cache was written for, kept beside that cache
+_CACHE_VERSION_PATH = Path(get_streamlit_file_path('cache')) / 'liver_model_version'
 
 # Cache the model loading to improve performance
 @st.cache_resource
-def load_model() -> Union[Pipeline, None]:
+def load_model() -> Pipeline:
     """
     Load the trained model from disk with caching for better performance
 
     Returns:
-        Union[Pipeline, None]: Loaded model or None if loading fails
-    """
-    try:
-        # Use the absolute path relative to this script’s location
-        model_path = Path(__file__).resolve().parent / 'liver_disease_staging_model.pkl'
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model file not found at {model_path}")
-        model = joblib.load(model_path)
-        return model
-    except Exception as e:
-        st.error(f"Error loading model: {str(e)}")
-        return None
+        Pipeline: Loaded model
+
+    Raises:
+        FileNotFoundError: If the model file does not exist
+    """
+    if not _MODEL_PATH.exists():
+        raise FileNotFoundError(f"Model file not found at {_MODEL_PATH}")
+    model = joblib.load(_MODEL_PATH)
+    return model
+
+# Fingerprint the model file so cached predictions are dropped after a retrain
+@st.cache_resource
+def get_model_version() -> str:
+    """
+    Return a content hash of the model file, clearing stale disk-cached predictions
+
+    Returns:
+        str: SHA-256 hex digest of the model file
+
+    Raises:
+        FileNotFoundError: If the model file does not exist
+    """
+    if not _MODEL_PATH.exists():
+        raise FileNotFoundError(f"Model file not found at {_MODEL_PATH}")
+    version = hashlib.sha256(_MODEL_PATH.read_bytes()).hexdigest()
+
+    # Disk entries are never evicted, so wipe them when the model they were made with changes
+    previous = _CACHE_VERSION_PATH.read_text() if _CACHE_VERSION_PATH.exists() else None
+    if previous != version:
+        _cached_predict.clear()
+        _CACHE_VERSION_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _CACHE_VERSION_PATH.write_text(version)
+    return version
+
+# Cache the stage labels alongside the model they come from
+@st.cache_resource
+def get_classes() -> Tuple[str, ...]:
+    """
+    Return the stage labels known to the loaded model
+
+    Returns:
+        Tuple[str, ...]: Stage names in the model's class order
+    """
+    return tuple(map(str, load_model().classes_))
 
 def validate_input_data(patient_data: Dict) -> Tuple[bool, str]:
     """
@@ -36,37 +116,28 @@ def validate_input_data(patient_data: Dict) -> Tuple[bool, str]:
     Returns:
         Tuple[bool, str]: (is_valid, error_message)
     """
-    try:
-        required_fields = {
-            'Age', 'Sex', 'Albumin', 'Bilirubin', 'ALT', 'AST', 'ALP',
-            'INR', 'Platelets', 'Sodium', 'Creatinine', 'Ascites',
-            'Hepatomegaly', 'Spiders', 'Edema'
-        }
-
-        missing_fields = required_fields - set(patient_data.keys())
-        if missing_fields:
-            return False, f"Missing required fields: {', '.join(missing_fields)}"
-
-        ranges = get_feature_ranges()
-        for field, (min_val, max_val) in ranges.items():
-            if field in patient_data:
-                value = patient_data[field]
-                if not isinstance(value, (int, float)):
-                    return False, f"{field} must be a number"
-                if value < min_val or value > max_val:
-                    return False, f"{field} must be between {min_val} and {max_val}"
-
-        if patient_data['Sex'] not in ['M', 'F']:
-            return False, "Sex must be either 'M' or 'F'"
-
-        boolean_fields = ['Ascites', 'Hepatomegaly', 'Spiders', 'Edema']
-        for field in boolean_fields:
-            if patient_data[field] not in [0, 1]:
-                return False, f"{field} must be 0 or 1"
-
-        return True, ""
-    except Exception as e:
-        return False, f"Validation error: {str(e)}"
+    missing_fields = _REQUIRED_FIELDS - patient_data.keys()
+    if missing_fields:
+        return False, f"Missing required fields: {', '.join(missing_fields)}"
+
+    for field, (min_val, max_val) in _FEATURE_RANGES.items():
+        value = patient_data[field]
+        if not isinstance(value, (int, float)):
+            return False, f"{field} must be a number"
+        if value < min_val or value > max_val:
+            return False, f"{field} must be between {min_val} and {max_val}"
+
+    if not isinstance(patient_data['Sex'], str) or patient_data['Sex'] not in ['M', 'F']:
+        return False, "Sex must be either 'M' or 'F'"
+
+    boolean_fields = ['Ascites', 'Hepatomegaly', 'Spiders', 'Edema']
+    for field in boolean_fields:
+        value = patient_data[field]
+        # Arrays and lists make `in` ambiguous or elementwise, so reject them first
+        if not np.isscalar(value) or value not in [0, 1]:
+            return False, f"{field} must be 0 or 1"
+
+    return True, ""
 
 def predict_liver_disease(patient_data: Dict) -> Tuple[str, Dict[str, float]]:
     """
@@ -80,25 +151,45 @@ def predict_liver_disease(patient_data: Dict) -> Tuple[str, Dict[str, float]]:
 
     Raises:
         ValueError: If input validation fails
-        RuntimeError: If model prediction fails
+        FileNotFoundError: If the model file does not exist
     """
     is_valid, error_message = validate_input_data(patient_data)
     if not is_valid:
         raise ValueError(error_message)
 
+    return _cached_predict(tuple(sorted(patient_data.items())), get_model_version())
+
+# Cache predictions on disk so repeated inputs skip inference across restarts.
+# max_entries only bounds the in-memory layer: Streamlit never evicts the disk
+# files, so they grow with every distinct patient vector until the model
+# version changes and get_model_version() clears them.
+@st.cache_data(max_entries=1024, persist="disk", show_spinner=False)
+def _cached_predict(patient_tuple: tuple, model_version: str) -> Tuple[str, Dict[str, float]]:
+    """
+    Run the model on a validated patient record
+
+    Args:
+        patient_tuple (tuple): Sorted (field, value) pairs of patient data
+        model_version (str): Model file fingerprint, part of the cache key only
+
+    Returns:
+        Tuple[str, Dict[str, float]]: (predicted_stage, probabilities_dict)
+
+    Raises:
+        FileNotFoundError: If the model file does not exist
+    """
     model = load_model()
-    if model is None:
-        raise RuntimeError("Failed to load model")
-
-    try:
-        df = pd.DataFrame([patient_data])
-        predicted_stage = model.predict(df)[0]
-        probabilities = model.predict_proba(df)[0]
-        stage_names = model.classes_
-        prob_dict = {stage: float(prob) for stage, prob in zip(stage_names, probabilities)}
-        return predicted_stage, prob_dict
-    except Exception as e:
-        raise RuntimeError(f"Prediction error: {str(e)}")
+
+    # The ColumnTransformer selects columns by name, so it needs a DataFrame;
+    # building it column-wise skips the slower list-of-records inference path
+    patient = dict(patient_tuple)
+    df = pd.DataFrame({field: [patient[field]] for field in _FEATURE_ORDER})
+    # One pass through the pipeline; the predicted stage is the most probable class
+    probabilities = model.predict_proba(df)[0]
+    stage_names = get_classes()
+    predicted_stage = stage_names[int(np.argmax(probabilities))]
+    prob_dict = {stage: float(prob) for stage, prob in zip(stage_names, probabilities)}
+    return predicted_stage, prob_dict
 
 def get_feature_ranges() -> Dict[str, Tuple[float, float]]:
     """
@@ -107,18 +198,7 @@ def get_feature_ranges() -> Dict[str, Tuple[float, float]]:
     Returns:
         Dict[str, Tuple[float, float]]: Dictionary of feature ranges
     """
-    return {
-        'Age': (18, 90),
-        'Albumin': (2.0, 6.0),
-        'Bilirubin': (0.3, 10.0),
-        'ALT': (7, 2000),
-        'AST': (10, 2000),
-        'ALP': (44, 500),
-        'INR': (0.5, 5.0),
-        'Platelets': (20, 500),
-        'Sodium': (125, 145),
-        'Creatinine': (0.5, 4.0)
-    }
+    return _FEATURE_RANGES
 
 def get_feature_descriptions() -> Dict[str, str]:
     """
@@ -127,20 +207,4 @@ def get_feature_descriptions() -> Dict[str, str]:
     Returns:
         Dict[str, str]: Dictionary of feature descriptions
     """
-    return {
-        'Age': "Patient's age in years",
-        'Sex': "Patient's biological sex (M/F)",
-        'Albumin': "Serum albumin level (Normal: 3.5-5.5 g/dL)",
-        'Bilirubin': "Total bilirubin level (Normal: 0.3-1.2 mg/dL)",
-        'ALT': "Alanine aminotransferase (Normal: 7-56 U/L)",
-        'AST': "Aspartate aminotransferase (Normal: 10-40 U/L)",
-        'ALP': "Alkaline phosphatase (Normal: 44-147 U/L)",
-        'INR': "International normalized ratio (Normal: 0.8-1.1)",
-        'Platelets': "Platelet count (Normal: 150-450 ×10⁹/L)",
-        'Sodium': "Serum sodium level (Normal: 135-145 mEq/L)",
-        'Creatinine': "Serum creatinine (Normal: 0.7-1.3 mg/dL)",
-        'Ascites': "Accumulation of fluid in the peritoneal cavity",
-        'Hepatomegaly': "Enlarged liver",
-        'Spiders': "Spider angiomas (spider-like blood vessels)",
-        'Edema': "Swelling caused by fluid retention"
-    }
+    return _FEATURE_DESCRIPTIONS